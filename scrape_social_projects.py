@@ -1,14 +1,58 @@
+import argparse
+import asyncio
 import csv
+import json
+import os
 import re
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Set, TextIO, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
 
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeoutError
+from playwright.async_api import async_playwright, TimeoutError as PWTimeoutError
 
 URL = "https://stripeyste.com/qualified-projects"
 OUT_CSV = "all_projects.csv"
-
-@dataclass
+CHECKPOINT_JSONL = "all_projects.jsonl"  # Project lines plus {"page": n} done markers
+OUT_SOCIAL_CSV = "social_projects.csv"
+OUT_SOCIAL_JSON = "social_projects.json"
+SOCIAL_CATEGORY = "Social & Behavioural Sciences"
+N_WORKERS = 4  # parallel browser contexts, each loading every N-th page by URL
+
+COUNTER_SELECTORS = [
+    "text=/\\d+\\s*\\/\\s*\\d+/",
+    "[class*='counter']",
+    "[class*='pagination'] >> text=/\\d+\\s*\\/\\s*\\d+/",
+]
+NEXT_SELECTORS = [
+    "a[aria-label='Next']",
+    "button[aria-label='Next']",
+    "a:has-text('Next')",
+    "button:has-text('Next')",
+    ".w-pagination-next",
+    "[class*='next']",
+    "[data-direction='next']",
+]
+# Loose fallbacks: a hit on one of these is never promoted ahead of the
+# specific selectors listed before it.
+_UNCACHED_SELECTORS = {"[class*='counter']", "[class*='next']"}
+
+# Nothing we parse depends on these, so don't let Chromium fetch them.
+# Stylesheets stay: innerText and the visibility waits depend on computed styles.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+BLOCKED_HOSTS_RE = re.compile(
+    r"(google-analytics|googletagmanager|doubleclick|facebook\.net|hotjar|"
+    r"clarity\.ms|segment\.io|adservice|adsystem)",
+    re.IGNORECASE,
+)
+
+@dataclass(slots=True)
+class SelectorHits:
+    """Per-page memory of which counter/Next selector last matched."""
+    counter: List[int] = field(default_factory=list)
+    next: List[int] = field(default_factory=list)
+
+
+@dataclass(slots=True)
 class Project:
     title: str
     stand_number: int
@@ -19,16 +63,70 @@ class Project:
     project_type: str  # merged: Group or Individual
 
 
-_FIELD_PATTERNS = {
-    "stand_number": re.compile(r"Stand number:\s*([0-9]+)", re.IGNORECASE),
-    "county": re.compile(r"County:\s*(.+)", re.IGNORECASE),
-    "school": re.compile(r"School:\s*(.+)", re.IGNORECASE),
-    "category": re.compile(r"Category:\s*(.+)", re.IGNORECASE),
-    "project_type": re.compile(r"Project type:\s*(.+)", re.IGNORECASE),
-}
+_ALL_FIELDS = re.compile(
+    r"(?P<key>Stand number|County|School|Category|Project type):\s*(?P<val>[^\n]+)",
+    re.IGNORECASE,
+)
 
+_STAND_NUMBER_RE = re.compile(r"[0-9]+")
 _COUNTER_RE = re.compile(r"(\d+)\s*/\s*(\d+)")
 
+# Elements with an own text node mentioning the label; a plain XPath match skips
+# the normalisation the text= engine does on every candidate.
+_STAND_NUMBER_XPATH = "xpath=.//*[text()[contains(., 'Stand number:')]]"
+
+# Runs in the page: the 'X / Y' counter text, or "".
+_PAGE_COUNTER_JS = """() => {
+    const re = /\\d+\\s*\\/\\s*\\d+/;
+    // the counter element is far cheaper to read than the whole body
+    const el = document.querySelector("[class*='counter']");
+    const m = (el && (el.innerText || "").match(re)) ||
+              (document.body.innerText || "").match(re);
+    return m ? m[0] : "";
+}"""
+
+# Runs in the page: the first card's label-line text. The stand number sits
+# next to its label, so this is unique per page.
+_FIRST_CARD_JS = """() => {
+    const node = document.evaluate(
+      "//*[text()[contains(., 'Stand number:')]]",
+      document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+    return node && node.parentElement ? (node.parentElement.innerText || "") : "";
+}"""
+
+_PAGE_STATE_JS = f"() => [({_PAGE_COUNTER_JS})(), ({_FIRST_CARD_JS})()]"
+
+# Runs in the page over every 'Stand number:' node: returns the de-duplicated
+# innerText of each node's enclosing project card.
+_PROJECT_BLOCKS_JS = """(nodes) => {
+    const LABELS = /Stand number:|County:|School:|Category:|Project type:/g;
+    const MAX_BLOCK_CHARS = 50000;  // past this we've walked out of the card
+    function hasAllLabels(t) {
+      const m = t.match(LABELS);
+      return m !== null && new Set(m).size >= 5;
+    }
+    const seen = new Set();
+    const out = [];
+    for (const node of nodes) {
+      let cur = node;
+      for (let i = 0; i < 10 && cur; i++) {
+        const t = cur.innerText || "";
+        if (t.length > MAX_BLOCK_CHARS) break;
+        if (hasAllLabels(t)) {
+          const block = t.trim();
+          if (block && !seen.has(block)) {
+            seen.add(block);
+            out.push(block);
+          }
+          break;
+        }
+        cur = cur.parentElement;
+      }
+    }
+    return out;
+}"""
+
 
 def clean(s: str) -> str:
     return " ".join((s or "").strip().split())
@@ -47,28 +145,30 @@ def parse_counter(counter_text: str) -> Optional[Tuple[int, int]]:
 
 
 def parse_project_block(text_block: str) -> Optional[Project]:
-    text_block = (text_block or "").strip()
-    if not text_block:
+    if not text_block or "Stand number:" not in text_block:
         return None
-
-    lines = [ln.strip() for ln in text_block.splitlines() if ln.strip()]
-    if not lines:
+    text_block = text_block.strip()
+    # stripped, so the first line is the (non-empty) title
+    title = clean(text_block.partition("\n")[0])
+
+    # 'Project type:' is the last label on a card; anything well past its value
+    # line ("Watch video" etc.) is decoration the regex need not walk.
+    idx = text_block.rfind("Project type:")
+    scan_region = text_block[:idx + 200] if idx > 0 else text_block
+
+    extracted: Dict[str, str] = {}
+    for m in _ALL_FIELDS.finditer(scan_region):
+        extracted.setdefault(m.group("key").lower(), clean(m.group("val")))
+    if len(extracted) < 5:
         return None
-    title = clean(lines[0])
 
-    extracted = {}
-    for key, pat in _FIELD_PATTERNS.items():
-        m = pat.search(text_block)
-        if not m:
-            return None
-        extracted[key] = clean(m.group(1))
-
-    try:
-        stand_number = int(extracted["stand_number"])
-    except ValueError:
+    # leading digits only, e.g. "12A" -> 12
+    m = _STAND_NUMBER_RE.match(extracted["stand number"])
+    if not m:
         return None
+    stand_number = int(m.group(0))
 
-    raw_type = extracted["project_type"]
+    raw_type = extracted["project type"]
     return Project(
         title=title,
         stand_number=stand_number,
@@ -80,14 +180,36 @@ def parse_project_block(text_block: str) -> Optional[Project]:
     )
 
 
-def first_visible_text(page, selector_candidates: List[str], timeout_ms: int = 1500) -> Optional[str]:
-    for sel in selector_candidates:
+def _cached_first(selector_candidates: List[str], cache: Optional[List[int]]) -> List[Tuple[int, str]]:
+    """
+    Candidates in try order: the index remembered in `cache` (a one-element
+    list, shared across calls) first, then the rest.
+    """
+    ordered = list(enumerate(selector_candidates))
+    if cache:
+        ordered.insert(0, ordered.pop(cache[0]))
+    return ordered
+
+
+def _remember(cache: Optional[List[int]], idx: int, sel: str) -> None:
+    if cache is not None and sel not in _UNCACHED_SELECTORS:
+        cache[:] = [idx]
+
+
+async def first_visible_text(
+    page,
+    selector_candidates: List[str],
+    timeout_ms: int = 1500,
+    cache: Optional[List[int]] = None,
+) -> Optional[str]:
+    for idx, sel in _cached_first(selector_candidates, cache):
         try:
             loc = page.locator(sel).first
-            if loc.count() > 0:
-                loc.wait_for(state="visible", timeout=timeout_ms)
-                txt = (loc.inner_text(timeout=timeout_ms) or "").strip()
+            if await loc.count() > 0:
+                await loc.wait_for(state="visible", timeout=timeout_ms)
+                txt = (await loc.inner_text(timeout=timeout_ms) or "").strip()
                 if txt:
+                    _remember(cache, idx, sel)
                     return txt
         except PWTimeoutError:
             continue
@@ -96,14 +218,20 @@ def first_visible_text(page, selector_candidates: List[str], timeout_ms: int = 1
     return None
 
 
-def click_first_available(page, selector_candidates: List[str], timeout_ms: int = 1500) -> bool:
-    for sel in selector_candidates:
+async def click_first_available(
+    page,
+    selector_candidates: List[str],
+    timeout_ms: int = 1500,
+    cache: Optional[List[int]] = None,
+) -> bool:
+    for idx, sel in _cached_first(selector_candidates, cache):
         try:
             loc = page.locator(sel).first
-            if loc.count() == 0:
+            if await loc.count() == 0:
                 continue
-            loc.wait_for(state="visible", timeout=timeout_ms)
-            loc.click(timeout=timeout_ms)
+            await loc.wait_for(state="visible", timeout=timeout_ms)
+            await loc.click(timeout=timeout_ms)
+            _remember(cache, idx, sel)
             return True
         except PWTimeoutError:
             continue
@@ -112,145 +240,527 @@ def click_first_available(page, selector_candidates: List[str], timeout_ms: int
     return False
 
 
-def get_project_blocks(page) -> List[str]:
+async def page_state(page) -> List[str]:
+    """Snapshot of what identifies the current listing page; see _PAGE_STATE_JS."""
+    try:
+        return await page.evaluate(_PAGE_STATE_JS)
+    except Exception:
+        return ["", ""]
+
+
+async def wait_for_page_change(page, prev_state: List[str], timeout_ms: int = 5000) -> bool:
+    """
+    Block until the listing no longer matches `prev_state`, i.e. the click on
+    Next has actually advanced it. Both the 'X / Y' counter and the first card
+    must move when present; without a counter the first card alone decides.
+    Returns False if nothing changed within the timeout. Polls every 100 ms
+    rather than every animation frame.
+    """
+    try:
+        await page.wait_for_function(
+            f"""(prev) => {{
+                const counter = ({_PAGE_COUNTER_JS})();
+                // common case while waiting: counter unchanged, skip the card walk
+                if (prev[0] && counter === prev[0]) return false;
+                const card = ({_FIRST_CARD_JS})();
+                if (!counter && !card) return false;
+                return (!prev[0] || counter !== prev[0]) &&
+                       (!prev[1] || card !== prev[1]);
+            }}""",
+            arg=prev_state,
+            polling=100,
+            timeout=timeout_ms,
+        )
+        return True
+    except PWTimeoutError:
+        return False
+
+
+async def get_project_blocks(page) -> List[str]:
     """
     Find project “cards” by locating 'Stand number:' and walking up the DOM
-    to an ancestor that contains all labels we need.
+    to an ancestor that contains all labels we need. The nodes are resolved
+    and walked in the browser via evaluate_all, so this is a single
+    round-trip per page.
     """
-    candidates = []
-    for node in page.locator("text=Stand number:").all():
-        try:
-            handle = node.element_handle()
-            if not handle:
+    try:
+        blocks = await page.locator(_STAND_NUMBER_XPATH).evaluate_all(_PROJECT_BLOCKS_JS)
+    except Exception:
+        return []
+    return [b for b in blocks or [] if isinstance(b, str) and b]
+
+
+def page_changed(prev_state: List[str], cur_state: List[str]) -> bool:
+    """Python side of the wait_for_page_change predicate."""
+    if not cur_state[0] and not cur_state[1]:
+        return False
+    return (not prev_state[0] or cur_state[0] != prev_state[0]) and (
+        not prev_state[1] or cur_state[1] != prev_state[1]
+    )
+
+
+async def advance_page(
+    page,
+    hits: SelectorHits,
+    expected: Optional[int] = None,
+    attempts: int = 2,
+) -> bool:
+    """
+    Click Next and wait for the page to change. With `expected` (the page
+    number the counter should then show), a click that did not land is
+    retried; landing further on logs the skipped pages and carries on from
+    there. Returns False only if the listing could not be advanced at all.
+    """
+    for _ in range(attempts):
+        prev_state = await page_state(page)
+        if not await click_first_available(page, NEXT_SELECTORS, cache=hits.next):
+            return False
+        if not await wait_for_page_change(page, prev_state):
+            # the click may have landed just after the timeout; clicking again
+            # then would skip the page it loaded
+            if not page_changed(prev_state, await page_state(page)):
+                print("Next click did not change the page; retrying")
                 continue
+        if expected is None:
+            return True
+        counter = parse_counter(await first_visible_text(page, COUNTER_SELECTORS, cache=hits.counter) or "")
+        if counter is None or counter[0] == expected:
+            return True
+        if counter[0] > expected:
+            print(f"Expected page {expected} after Next, landed on {counter[0]}; "
+                  f"missed pages {list(range(expected, counter[0]))}")
+            return True
+        print(f"Expected page {expected} after Next, counter still shows {counter[0]}; retrying")
+    return False
 
-            block = page.evaluate(
-                """(el) => {
-                    function hasAllLabels(n) {
-                      const t = (n.innerText || "");
-                      return t.includes("Stand number:") &&
-                             t.includes("County:") &&
-                             t.includes("School:") &&
-                             t.includes("Category:") &&
-                             t.includes("Project type:");
-                    }
-                    let cur = el;
-                    for (let i=0; i<10 && cur; i++) {
-                      if (hasAllLabels(cur)) return cur.innerText;
-                      cur = cur.parentElement;
-                    }
-                    return null;
-                }""",
-                handle,
-            )
 
-            # Python uses "and" (not &&)
-            if block and isinstance(block, str):
-                candidates.append(block)
-        except Exception:
+async def block_heavy_requests(route) -> None:
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or BLOCKED_HOSTS_RE.search(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def wait_for_cards(page, timeout_ms: int = 10_000) -> None:
+    # same nodes get_project_blocks extracts from, so passing this means cards
+    await page.locator(_STAND_NUMBER_XPATH).first.wait_for(state="visible", timeout=timeout_ms)
+
+
+async def new_listing_page(context, page=None):
+    """A page with heavy requests blocked, nothing loaded yet."""
+    if page is None:
+        page = await context.new_page()
+    await page.route("**/*", block_heavy_requests)
+    return page
+
+
+async def open_listing(context, page=None):
+    page = await new_listing_page(context, page)
+    await page.goto(URL, wait_until="domcontentloaded")
+    await wait_for_cards(page)
+    return page
+
+
+async def collect_page(
+    page,
+    collected: Dict[Tuple[str, int, str], Project],
+    checkpoint: Optional[TextIO],
+    parsed_blocks: Set[str],
+) -> None:
+    for b in await get_project_blocks(page):
+        # same card text seen on an earlier view: skip the regex work
+        if b in parsed_blocks:
+            continue
+        parsed_blocks.add(b)
+        pr = parse_project_block(b)
+        if not pr:
             continue
+        key = (pr.title, pr.stand_number, pr.school)
+        # fresh rows replace any seeded from a checkpoint
+        prev = collected.get(key)
+        collected[key] = pr
+        if checkpoint is not None and prev != pr:
+            checkpoint.write(json.dumps(asdict(pr), ensure_ascii=False) + "\n")
+            checkpoint.flush()
+
+
+async def scrape_pages(
+    page,
+    collected: Dict[Tuple[str, int, str], Project],
+    checkpoint: Optional[TextIO] = None,
+    parsed_blocks: Optional[Set[str]] = None,
+    hits: Optional[SelectorHits] = None,
+) -> None:
+    """
+    Walk the listing from the page it is showing by clicking Next, checking
+    the counter lands on the following page each time.
+    """
+    if parsed_blocks is None:
+        parsed_blocks = set()
+    if hits is None:
+        hits = SelectorHits()
+
+    last_counter = None
+    safety_clicks = 0
+
+    while True:
+        await collect_page(page, collected, checkpoint, parsed_blocks)
+
+        counter_text = await first_visible_text(page, COUNTER_SELECTORS, cache=hits.counter)
+        counter = parse_counter(counter_text or "")
+        expected = None
+        if counter:
+            current, total = counter
+            if last_counter == counter:
+                break
+            last_counter = counter
+            if current >= total:
+                break
+            expected = current + 1
 
-    seen = set()
-    out = []
-    for c in candidates:
-        c = c.strip()
-        if c and c not in seen:
-            seen.add(c)
-            out.append(c)
-    return out
+        safety_clicks += 1
+        if safety_clicks > 5000:
+            break
 
+        if not await advance_page(page, hits, expected):
+            break
 
-def main():
-    # de-dupe across pagination
-    collected: Dict[Tuple[str, int, str], Project] = {}
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.goto(URL, wait_until="domcontentloaded")
-        page.wait_for_timeout(1200)
-
-        counter_selectors = [
-            "text=/\\d+\\s*\\/\\s*\\d+/",
-            "[class*='counter']",
-            "[class*='pagination'] >> text=/\\d+\\s*\\/\\s*\\d+/",
-        ]
-        next_selectors = [
-            "a[aria-label='Next']",
-            "button[aria-label='Next']",
-            "a:has-text('Next')",
-            "button:has-text('Next')",
-            ".w-pagination-next",
-            "[class*='next']",
-            "[data-direction='next']",
-        ]
-
-        last_counter = None
-        safety_clicks = 0
-
-        while True:
-            for b in get_project_blocks(page):
-                pr = parse_project_block(b)
-                if not pr:
+def find_page_param(page_url: str, next_href: Optional[str]) -> Optional[str]:
+    """
+    Name of the query parameter Webflow pagination uses ('<id>_page'), read
+    from the Next link's href.
+    """
+    if not next_href:
+        return None
+    query = urlsplit(urljoin(page_url, next_href)).query
+    for name, _ in parse_qsl(query):
+        if name == "page" or name.endswith("_page"):
+            return name
+    return None
+
+
+def listing_page_url(param: str, number: int) -> str:
+    parts = urlsplit(URL)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != param]
+    query.append((param, str(number)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+async def next_link_href(page) -> Optional[str]:
+    try:
+        loc = page.locator("a.w-pagination-next").first
+        if await loc.count() == 0:
+            return None
+        return await loc.get_attribute("href", timeout=1500)
+    except Exception:
+        return None
+
+
+async def scrape_page_numbers(
+    page,
+    numbers: List[int],
+    param: str,
+    collected: Dict[Tuple[str, int, str], Project],
+    checkpoint: Optional[TextIO],
+    parsed_blocks: Set[str],
+    hits: SelectorHits,
+    showing: Optional[int] = None,
+) -> List[int]:
+    """
+    Load each listing page directly by URL and scrape it. `showing` is the
+    page number `page` already has loaded, if any. Returns the page numbers
+    that could not be loaded.
+    """
+    missed = []
+    for number in numbers:
+        if number != showing and not await goto_listing_page(page, param, number, hits):
+            missed.append(number)
+            continue
+        showing = None
+        await collect_page(page, collected, checkpoint, parsed_blocks)
+        if checkpoint is not None:
+            # after the page's projects, so a resume can skip the page
+            checkpoint.write(json.dumps({"page": number}) + "\n")
+            checkpoint.flush()
+    return missed
+
+
+async def goto_listing_page(
+    page,
+    param: str,
+    number: int,
+    hits: SelectorHits,
+    attempts: int = 2,
+) -> bool:
+    """Load listing page `number` by URL and check the counter agrees."""
+    for _ in range(attempts):
+        try:
+            await page.goto(listing_page_url(param, number), wait_until="domcontentloaded")
+            await wait_for_cards(page)
+        except Exception as e:
+            print(f"Loading page {number} failed ({e!r}); retrying")
+            continue
+        counter = parse_counter(await first_visible_text(page, COUNTER_SELECTORS, cache=hits.counter) or "")
+        if counter is None or counter[0] == number:
+            return True
+        print(f"Expected page {number}, counter shows {counter[0]}; retrying")
+    return False
+
+
+def load_checkpoint(path: str) -> Tuple[Dict[Tuple[str, int, str], Project], Set[int]]:
+    """
+    Seed `collected` and the set of finished page numbers from a previous,
+    interrupted run. A line cut short by a crash is skipped.
+    """
+    collected: Dict[Tuple[str, int, str], Project] = {}
+    done_pages: Set[int] = set()
+    if not os.path.exists(path):
+        return collected, done_pages
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+                if "page" in row:
+                    done_pages.add(int(row["page"]))
                     continue
-                key = (pr.title, pr.stand_number, pr.school)
-                collected[key] = pr
-
-            counter_text = first_visible_text(page, counter_selectors)
-            counter = parse_counter(counter_text or "")
-            if counter:
-                current, total = counter
-                if last_counter == counter:
-                    break
-                last_counter = counter
-                if current >= total:
-                    break
-
-            if not click_first_available(page, next_selectors):
-                break
+                pr = Project(**row)
+            except (ValueError, TypeError):
+                continue
+            collected[(pr.title, pr.stand_number, pr.school)] = pr
+    return collected, done_pages
+
+
+async def scrape_projects(
+    n_workers: int = N_WORKERS,
+    checkpoint_path: str = CHECKPOINT_JSONL,
+    resume: bool = False,
+    cdp_endpoint: Optional[str] = None,
+    user_data_dir: Optional[str] = None,
+) -> Dict[Tuple[str, int, str], Project]:
+    # de-dupe across pagination (and across workers)
+    collected: Dict[Tuple[str, int, str], Project] = {}
+    done_pages: Set[int] = set()
+    if resume:
+        collected, done_pages = load_checkpoint(checkpoint_path)
+        print(f"Resuming with {len(collected)} projects and {len(done_pages)} "
+              f"finished pages from {checkpoint_path}")
+    elif os.path.exists(checkpoint_path):
+        print(f"Ignoring leftover {checkpoint_path}; pass --resume to continue from it")
+
+    with open(checkpoint_path, "a" if resume else "w", encoding="utf-8") as checkpoint:
+        await _scrape_into(collected, done_pages, n_workers, checkpoint, cdp_endpoint, user_data_dir)
+
+    return collected
+
+
+async def _scrape_into(
+    collected: Dict[Tuple[str, int, str], Project],
+    done_pages: Set[int],
+    n_workers: int,
+    checkpoint: TextIO,
+    cdp_endpoint: Optional[str],
+    user_data_dir: Optional[str],
+) -> None:
+    async with async_playwright() as p:
+        first_page = None
+        if cdp_endpoint:
+            # long-lived browser started elsewhere: close only the contexts this
+            # run created and leave the browser itself running; leaving the
+            # async_playwright block drops the connection
+            browser = await p.chromium.connect_over_cdp(cdp_endpoint)
+            created = []
+
+            async def new_context():
+                ctx = await browser.new_context()
+                created.append(ctx)
+                return ctx
+
+            async def close():
+                for ctx in created:
+                    await ctx.close()
+        elif user_data_dir:
+            # a persistent context is a single context: workers share it
+            context = await p.chromium.launch_persistent_context(user_data_dir, headless=True)
+            first_page = context.pages[0] if context.pages else None
+
+            async def new_context():
+                return context
+
+            close = context.close
+        else:
+            browser = await p.chromium.launch(headless=True)
+            new_context, close = browser.new_context, browser.close
+
+        first_page = await open_listing(await new_context(), first_page)
+        first_hits = SelectorHits()
+
+        counter = parse_counter(await first_visible_text(first_page, COUNTER_SELECTORS, cache=first_hits.counter) or "")
+        param = find_page_param(first_page.url, await next_link_href(first_page))
+        parsed_blocks: Set[str] = set()
+
+        if counter is None or param is None:
+            # Pages can't be addressed directly: walk them serially with Next,
+            # since splitting a click-through walk only multiplies the clicks.
+            # Without page URLs a resume can't skip pages, so this is always
+            # the full walk.
+            await scrape_pages(first_page, collected, checkpoint, parsed_blocks, first_hits)
+        else:
+            await scrape_in_parallel(
+                first_page, first_hits, counter, param, new_context, n_workers,
+                collected, checkpoint, parsed_blocks, done_pages,
+            )
 
-            safety_clicks += 1
-            if safety_clicks > 5000:
-                break
+        await close()
+
+
+async def scrape_in_parallel(
+    first_page,
+    first_hits: SelectorHits,
+    counter: Tuple[int, int],
+    param: str,
+    new_context,
+    n_workers: int,
+    collected: Dict[Tuple[str, int, str], Project],
+    checkpoint: TextIO,
+    parsed_blocks: Set[str],
+    done_pages: Set[int],
+) -> None:
+    """
+    Split the listing's pages not in `done_pages` across `n_workers` contexts,
+    each loading every N-th of them by URL. Pages a worker could not load are
+    retried serially.
+    """
+    pending = [n for n in range(1, counter[1] + 1) if n not in done_pages]
+    if not pending:
+        return
+    n_workers = max(1, min(n_workers, len(pending)))
+    shares = [pending[i::n_workers] for i in range(n_workers)]
+
+    async def worker(i: int) -> List[int]:
+        if i == 0:
+            page, hits, showing = first_page, first_hits, counter[0]
+        else:
+            # no detour via page 1: scrape_page_numbers loads shares[i][0] by URL
+            page, hits, showing = await new_listing_page(await new_context()), SelectorHits(), None
+        return await scrape_page_numbers(
+            page, shares[i], param, collected, checkpoint, parsed_blocks, hits, showing
+        )
 
-            page.wait_for_timeout(700)
+    results = await asyncio.gather(*(worker(i) for i in range(n_workers)), return_exceptions=True)
+
+    # one failed worker shouldn't lose the run: redo its pages serially
+    retry: List[int] = []
+    for i, result in enumerate(results):
+        if isinstance(result, BaseException):
+            print(f"Worker {i} failed ({result!r}); retrying its pages")
+            retry.extend(shares[i])
+        else:
+            retry.extend(result)
+    if not retry:
+        return
+    try:
+        missed = await scrape_page_numbers(
+            first_page, sorted(retry), param, collected, checkpoint, parsed_blocks, first_hits
+        )
+    except Exception as e:
+        print(f"Retry failed ({e!r})")
+        missed = sorted(retry)
+    if missed:
+        print(f"Could not scrape pages: {missed}")
+
+
+def project_sort_key(p: Project) -> Tuple[str, str, int]:
+    # sorted() calls this exactly once per project, so each .lower() runs once.
+    return p.category.lower(), p.project_type.lower(), p.stand_number
+
+
+CSV_FIELDS = (
+    "category",
+    "project_type",      # merged Group/Individual
+    "stand_number",
+    "title",
+    "county",
+    "school",
+    "project_type_raw",  # original Group (2)/(3)
+)
+
+
+def write_csv(path: str, projects: List[Project]) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(CSV_FIELDS)
+        w.writerows(
+            (p.category, p.project_type, p.stand_number, p.title, p.county, p.school, p.project_type_raw)
+            for p in projects
+        )
 
-        browser.close()
 
-    projects = sorted(
-        collected.values(),
-        key=lambda x: (x.category.lower(), x.project_type.lower(), x.stand_number),
-    )
+def write_json(path: str, projects: List[Project]) -> None:
+    json_out = [asdict(p) for p in projects]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(json_out, ensure_ascii=False, separators=(",", ":")))
 
-    with open(OUT_CSV, "w", encoding="utf-8", newline="") as f:
-        w = csv.DictWriter(
-            f,
-            fieldnames=[
-                "category",
-                "project_type",      # merged Group/Individual
-                "stand_number",
-                "title",
-                "county",
-                "school",
-                "project_type_raw",  # original Group (2)/(3)
-            ],
+
+def run(
+    cdp_endpoint: Optional[str] = None,
+    user_data_dir: Optional[str] = None,
+    checkpoint_path: str = CHECKPOINT_JSONL,
+    resume: bool = False,
+):
+    """
+    Scrape the listing once and write both the full CSV and the
+    social-category subset (CSV + JSON).
+    """
+    collected = asyncio.run(
+        scrape_projects(
+            checkpoint_path=checkpoint_path,
+            resume=resume,
+            cdp_endpoint=cdp_endpoint,
+            user_data_dir=user_data_dir,
         )
-        w.writeheader()
-        for p in projects:
-            w.writerow(
-                {
-                    "category": p.category,
-                    "project_type": p.project_type,
-                    "stand_number": p.stand_number,
-                    "title": p.title,
-                    "county": p.county,
-                    "school": p.school,
-                    "project_type_raw": p.project_type_raw,
-                }
-            )
+    )
+
+    projects = sorted(collected.values(), key=project_sort_key)
+    social = [pr for pr in projects if pr.category.strip() == SOCIAL_CATEGORY]
 
+    write_csv(OUT_CSV, projects)
     print(f"Wrote {len(projects)} rows to {OUT_CSV}")
 
+    write_csv(OUT_SOCIAL_CSV, social)
+    write_json(OUT_SOCIAL_JSON, social)
+    print(f"Wrote {len(social)} rows to {OUT_SOCIAL_CSV} and {OUT_SOCIAL_JSON}")
+
+    # outputs are complete, so the next run should start from scratch
+    os.remove(checkpoint_path)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scrape the qualified projects listing.")
+    parser.add_argument(
+        "--cdp-endpoint",
+        help="connect to an already running Chromium (e.g. ws://127.0.0.1:9222/...) instead of launching one",
+    )
+    parser.add_argument(
+        "--user-data-dir",
+        help="launch a persistent context in this directory (e.g. .pw-cache) to reuse its profile; "
+        "request routing keeps the HTTP cache disabled",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=f"continue an interrupted run from its {CHECKPOINT_JSONL}: its projects are kept and "
+        "pages it finished are not loaded again (when the listing has to be walked with Next, "
+        "every page is still visited)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    run(cdp_endpoint=args.cdp_endpoint, user_data_dir=args.user_data_dir, resume=args.resume)
+
 
 if __name__ == "__main__":
     main()